@@ -1,388 +1,757 @@
-"""
-This module contains classes and functions for running rss_reader program.
-Classes:
-Feed  - contains all attributes and methods to manipulate data from rss feed.
-NotRssLink  - exception class to handle urls that do not contains rss feed data.
-NoNewsFound -  exception occurs when news were not found by the date
-"""
-
-import json
-import os.path
-import requests
-from bs4 import BeautifulSoup, Tag
-import warnings
-from datetime import datetime
-from dateutil.parser import parse
-import logging
-import sys
-import pkg_resources
-from pathlib import Path
-
-
-class Feed:
-    """
-    A class to represent rss feed.
-
-    Attributes
-    ----------
-    req : requests.models.Response
-        `Response <Response>` object, which contains a server's response to an HTTP request
-    soup : bs4.BeautifulSoup
-        data structure representing a parsed XML document for url of rss feed
-    feed_title : str
-        Title of the rss feed
-    feed_items : bs4.element.ResultSet
-        contains all data of 'item' elements
-    news_count : int
-        count of news in rss feed
-
-    Methods
-    -------
-    get_dict(limit=0):
-        Returns dictionary with 2 keys 'feed_title' and 'items'.
-        'items' contains list if dictionaries for each rss news"
-    get_json_from_feed(limit=0):
-        This method returns news from the feed in json format.
-    get_text_from_feed(limit=0):
-        This method returns human-readable text with news from rss feed.
-    html_to_text(input):
-        This method checks if string has HTML tags, and returns clean text without tags.
-    """
-
-    def __init__(self, rss_url):
-        """
-        Constructs all the necessary attributes for the Feed object.
-
-        Parameters
-        ----------
-        rss_url : url link
-            url link to rss feed
-
-        Attributes
-        ----------
-
-        req : requests.models.Response
-            `Response <Response>` object, which contains a server's response to an HTTP request
-        soup : bs4.BeautifulSoup
-            data structure representing a parsed XML document for url of rss feed
-        feed_title : str
-            Title of the rss feed
-        feed_items : bs4.element.ResultSet
-            contains all data of 'item' elements
-        news_count : int
-            count of news in rss feed
-        source: url
-            url of rss feed
-        """
-
-        try:
-            self.source = rss_url.rstrip("/")
-            self.req = requests.get(rss_url)
-            self.soup = BeautifulSoup(self.req.content, "xml")
-            if not self.soup.find("rss"):
-                raise NotRssLink(f"The source '{rss_url}' do not contain rss feed data")
-            self.feed_title = self.soup.find("title").text
-            self.feed_items = self.soup.findAll('item')
-            self.news_count = len(self.feed_items)
-            logging.debug(f"New Feed object '{self.feed_title}' created. "
-                          f"Total news count in the feed: {self.news_count} ")
-
-        except requests.exceptions.MissingSchema as exc:
-            print(exc)
-            sys.exit()
-        except requests.exceptions.InvalidSchema as exc:
-            print(exc)
-            sys.exit()
-        except requests.exceptions.ConnectionError as exc:
-            print(exc)
-            sys.exit()
-        except NotRssLink as exc:
-            print(exc)
-            sys.exit()
-
-    @staticmethod
-    def html_to_text(input):
-        """
-        Cleaning text from html tags.
-
-        Parameters: input (str): string data
-        Returns: String without html tags
-
-        """
-        # need warning filter because some tag items consists only urls, what leads to warning from bs4
-        warnings.filterwarnings("ignore", category=UserWarning, module='bs4')
-        soup = BeautifulSoup(input, "html.parser")
-        if bool(soup.find()):
-            return soup.get_text().replace("&nbsp", "").replace("&laquo;", "").replace("&raquo;", "")
-        else:
-            return input.replace("&nbsp", "").replace("&laquo;", "").replace("&raquo;", "")
-
-    def get_dict(self, limit=0):
-        """
-        This method returns dictionary with title and items from Feed object.
-        limit (optional argument) - quantity of news to display (if limit is not set then include all news )
-        """
-        logging.debug(f"Function 'get_dict' started. Limit: {limit}")
-
-        feed_dict = {"Feed title": self.feed_title, "Source": self.source}
-        items_list = []
-
-        for item in self.feed_items:
-            item_dict = {}
-            for el in item:
-                # skip non Tag elements of soup
-                if not isinstance(el, Tag):
-                    continue
-                else:
-                    # get data from elements that contains text
-                    if el.text:
-                        item_dict[el.name] = Feed.html_to_text(el.text)
-                    # get data from elements that contains url
-                    elif el.get('url'):
-                        item_dict[el.name] = el.get("url")
-            items_list.append(item_dict)
-        # sorting items by date
-        sorted_items = sorted(items_list, key=lambda x: parse(x['pubDate']), reverse=True)
-        # slice data for limited output
-        if limit > 0:
-            feed_dict['items'] = sorted_items[:limit]
-        else:
-            feed_dict['items'] = sorted_items
-
-        return feed_dict
-
-    def print_json_from_feed(self, limit=0):
-        """
-        This method returns news from source feed in json format.
-        limit (optional argument)  - quantity of news to display (if limit is not set then all news will be displayed)
-        """
-        logging.debug(f"Function 'print_json_from_feed' started.")
-
-        result_json = json.dumps(self.get_dict(limit), ensure_ascii=False, indent=3)
-        logging.debug(f"Creating of json completed. Count of news in json output: "
-                      f"{limit if self.news_count > limit > 0 else self.news_count}")
-        print(result_json)
-
-    def print_text_from_feed(self, limit=0):
-        """
-        This method returns human-readable news from rss feed.
-        limit (optional argument) - quantity of news to display
-                                    (if limit is not set then all news will be displayed)
-        """
-        logging.debug(f"Function 'print_text_from_feed' started.")
-
-        feed_dict = self.get_dict(limit)
-
-        output = f"\nFeed: {self.feed_title}\n" + "_" * (len(self.feed_title) + 6) + "\n\n"
-        for item in feed_dict['items']:
-            for key in item.keys():
-                if item[key] != "":
-                    output += f"{key.capitalize()}: {item[key]}\n"
-            output += f"\n{'*'*80}\n"
-        logging.debug(f"Creating of text completed. Count of news in text output: "
-                      f"{limit if self.news_count > limit > 0 else self.news_count}")
-        print(output)
-
-    def write_to_database(self, file_name):
-        """
-        Write new items to storage file.
-        Args:
-            file_name: path to storage file
-        """
-        logging.debug(f"Starting 'write_to_database' function for Feed instance '{self.feed_title}'")
-        storage_path = pkg_resources.resource_filename(__name__, file_name)
-        # create storage file
-        if not os.path.exists(storage_path):
-            with open(storage_path, "w") as json_file:
-                json.dump([self.get_dict()], json_file)
-                logging.debug(f"Created storage.json. "
-                              f"Data from '{self.feed_title}' added to storage.json. "
-                              f"Count of news added:{self.news_count}")
-        # update storage file if it already exist
-        else:
-            logging.debug(f"storage.json already exists")
-            try:
-                with open(storage_path, "r") as json_file:
-                    feed_list = json.load(json_file)
-                feeds_sources = [feed['Source'] for feed in feed_list]
-                logging.debug(f"Data from following feeds sources already in the storage: {feeds_sources}")
-
-                # for new source add full dictionary to database.
-                if self.source not in feeds_sources:
-                    feed_list.append(self.get_dict())
-                    logging.debug(f"Data from '{self.source}' is not in the storage.")
-                    logging.debug(f"All news from '{self.get_dict()['Feed title']}' added to the storage.")
-
-                # for source that already in storage adding only new items
-                else:
-                    logging.debug(f"Data from source '{self.source}' are already in the storage.")
-                    for feed in feed_list:
-                        if feed['Source'] == self.source:
-                            logging.debug(f"Start checking feed '{feed['Feed title']}' "
-                                          f"if there are new items in it.")
-                            # create list of unique identifiers for items that already in the storage
-                            stored_feed_guids = []
-                            for item in feed['items']:
-                                stored_feed_guids.append(item['guid'])
-                            # check each web item if it's guid not in the storage
-                            for new_item in self.get_dict()['items']:
-                                if new_item['guid'] not in stored_feed_guids:
-                                    feed['items'].append(new_item)
-                                    logging.debug(f"New item '{new_item['title']}' added to the storage.")
-            except json.decoder.JSONDecodeError:
-                print(f"No data in the file '{path}'")
-                # if file is empty add full dictionary to it
-                with open(storage_path, "w") as json_file:
-                    json.dump([self.get_dict()], json_file)
-                logging.debug(f"Data from '{self.feed_title}' added to storage.json. "
-                              f"Count of news added:{self.news_count}")
-            # save storage file
-            with open(storage_path, "w") as json_file:
-                json.dump(feed_list, json_file)
-
-    @staticmethod
-    def read_from_database(date, file_name, source=None,):
-        """
-        This function read data from database and returns data filtered by date and source"
-        If source is not not set, then it returns list of dictionaries from all sources with data filtered by date.
-        args:
-            date: date in "%Y%m%d" format (Example: 20211027).
-            file_name: name of storage file.
-            source: feed url, for which we wand to get data.
-        """
-        logging.debug(f"Starting 'read_from_database' function with params: date={date},source={source}")
-        # create relative path to storage
-        storage_path = pkg_resources.resource_filename(__name__, file_name)
-
-        # get all feeds from storage
-        try:
-            with open(storage_path, "r") as json_file:
-                feeds_list = json.load(json_file)
-            logging.debug(f"Data from '{storage_path}' read")
-            logging.debug(f"Feeds in database: '{[feed['Feed title'] for feed in feeds_list]}'")
-        except json.decoder.JSONDecodeError:
-            print(f"No data in the file '{storage_path}'.")
-            sys.exit()
-        except FileNotFoundError:
-            print("No storage detected. Please run rss_reader with source argument first to create storage.")
-            sys.exit()
-
-        # get news by date for all sources
-        try:
-            if not source:
-                output_list = []
-                for feed in feeds_list:
-                    items_on_date = []
-
-                    for item in feed['items']:
-                        if parse(item['pubDate']).date() == datetime.strptime(date, "%Y%m%d").date():
-                            items_on_date.append(item)
-
-                    sorted_items = sorted(items_on_date,
-                                          key=lambda x: parse(x['pubDate']),
-                                          reverse=True)
-                    logging.debug(f"The feed '{feed['Feed title']}' has {len(items_on_date)} "
-                                  f"items on the date - {datetime.strptime(date, '%Y%m%d').date()}.")
-                    if items_on_date:
-                        new_dict = {
-                            "Feed title": feed["Feed title"],
-                            "Source": feed["Source"],
-                            "items": sorted_items,
-                        }
-                        output_list.append(new_dict)
-                        logging.debug(f"List with {len(output_list)} feeds created.")
-                if output_list:
-                    return output_list
-                else:
-                    raise NoNewsFound(f"No news were found in storage for all feeds "
-                                      f"on the date {datetime.strptime(date, '%Y%m%d').date()} ")
-        except NoNewsFound as exc:
-            print(exc)
-            sys.exit()
-
-        # get news by source and date
-        try:
-            for feed in feeds_list:
-                if feed["Source"] == source:
-                    items_on_date = []
-                    number_of_news_this_date = 0
-                    for item in feed['items']:
-                        if parse(item['pubDate']).date() == datetime.strptime(date, "%Y%m%d").date():
-                            items_on_date.append(item)
-                            number_of_news_this_date += 1
-                    logging.debug(f"Number of news for requested date:{number_of_news_this_date}")
-                    if number_of_news_this_date == 0:
-                        raise NoNewsFound(f"No news were found in storage for feed '{feed['Feed title']}' "
-                                          f"on the date {datetime.strptime(date, '%Y%m%d').date()} ")
-                    sorted_items = sorted(items_on_date,
-                                          key=lambda x: parse(x['pubDate']),
-                                          reverse=True)
-                    new_dict = {
-                        "Feed title": feed["Feed title"],
-                        "Source": feed["Source"],
-                        "items": sorted_items,
-                    }
-                    logging.debug(f"Feed '{new_dict['Feed title']}' received from storage."
-                                  f"The Feed contain {len(new_dict['items'])} items.")
-                    return [new_dict]
-        except NoNewsFound as exc:
-            print(exc)
-            sys.exit()
-
-    @staticmethod
-    def print_data_json(feed_list, limit=0):
-        """
-        This method prints news from list of feeds.
-        args:
-            feed_list: list of feeds received from storage.
-            limit (optional): quantity of news from each feed to display (if limit is not set then
-                              all news will be displayed)
-        """
-        logging.debug(f"Function 'print_data_json' started. Input data type: {type(feed_list)}")
-        try:
-            if limit > 0:
-                for feed in feed_list:
-                    feed['items'] = feed['items'][:limit]
-            print(json.dumps(feed_list, ensure_ascii=False, indent=3))
-        except TypeError:
-            print("There is no data for this source in the storage.")
-            sys.exit()
-
-    @staticmethod
-    def get_text_from_storage(feed_list, limit=0):
-        """
-        This method prints news from feeds list in human-readable format.
-        feed_list: list of feeds received from storage.
-        limit (optional): quantity of news from each feed to display (if limit is not set then
-                          all news will be displayed)
-        """
-        logging.debug(f"Function 'get_text_from_storage' started. Input data type: {type(feed_list)}")
-
-        try:
-            if limit > 0:
-                for feed in feed_list:
-                    feed['items'] = feed['items'][:limit]
-            output = ""
-            for feed in feed_list:
-                output += f"\nFeed: {feed['Feed title']}\n" + "-" * 80 + "\n"
-                for item in feed['items']:
-                    for key in item.keys():
-                        if item[key] != "":
-                            output += f"{key.capitalize()}: {item[key]}\n"
-                    output += f"\n{'*' * 80}\n"
-            return output
-
-        except TypeError:
-            print("There is no data for this source in the storage.")
-            sys.exit()
-
-    def __str__(self):
-        return f"Rss feed {self.feed_title}"
-
-
-class NotRssLink(Exception):
-    """Exception class for urls that do not contain rss data"""
-
-
-class NoNewsFound(Exception):
-    """Exception occurs when news were not found by the date"""
+"""
+This module contains classes and functions for running rss_reader program.
+Classes:
+Feed  - contains all attributes and methods to manipulate data from rss feed.
+NotRssLink  - exception class to handle urls that do not contains rss feed data.
+NoNewsFound -  exception occurs when news were not found by the date
+"""
+
+import asyncio
+import io
+import json
+import os
+import requests
+import urllib3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# aiohttp drives the concurrent multi-feed downloads in Feed.fetch_many;
+# without it the fetches fall back to a thread pool over the shared session
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from package import storage
+from package.storage import json_dumps, json_loads, orjson
+from lxml import etree
+from datetime import datetime
+from dateutil import tz
+from dateutil.parser import parse
+from email.utils import parsedate_to_datetime
+import functools
+import html
+import logging
+import re
+import sys
+from importlib.resources import files
+from pathlib import Path
+
+# entities removed from item text; one precompiled regex pass
+# instead of three chained str.replace walks over the same string
+ENTITIES_RE = re.compile(r'&(?:nbsp|laquo;|raquo;)')
+
+# html tags in item text; a precompiled regex strips them orders of magnitude
+# faster than building a full html tree per string
+TAG_RE = re.compile(r'<[^>]+>')
+
+# storage files live next to the package modules; the path root is resolved once
+# at import - pkg_resources resolved it per call and is much slower to import
+_PKG_ROOT = files(__package__)
+
+# requests-cache stores responses in sqlite and honours ETag/Last-Modified,
+# so repeated runs against unchanged feeds become local 304 lookups;
+# fall back to a plain session when it is not installed
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# separate connect/read timeouts: fail fast on unreachable hosts while
+# still allowing slow feeds to stream their body
+_TIMEOUT = (3.05, 27)
+
+_session = None
+
+
+def _get_session():
+    """
+    Return the shared http session (keep-alive, connection pool, retries),
+    building it on first use. Construction is lazy because the requests-cache
+    backend creates its sqlite file, and importing the package must stay free
+    of side effects; the cache lands in the user cache directory, never
+    inside the installed package.
+    """
+    global _session
+    if _session is None:
+        if requests_cache is not None:
+            cache_dir = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "rss_reader"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # always_revalidate keeps every run on a cheap conditional GET -
+            # a plain expiry window would serve stale news with no network
+            # contact at all, which a news fetcher cannot afford
+            _session = requests_cache.CachedSession(str(cache_dir / "rss_cache"), backend="sqlite",
+                                                    cache_control=True, always_revalidate=True)
+        else:
+            _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=16, pool_maxsize=16,
+            max_retries=requests.adapters.Retry(total=3, backoff_factor=0.3))
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+
+# timezone abbreviations feeds use in pubDate; dateutil ignores unknown
+# abbreviations and returns naive datetimes, which breaks the date sort
+_TZINFOS = {
+    "UT": tz.UTC, "GMT": tz.UTC,
+    "EST": tz.gettz("US/Eastern"), "EDT": tz.gettz("US/Eastern"),
+    "CST": tz.gettz("US/Central"), "CDT": tz.gettz("US/Central"),
+    "MST": tz.gettz("US/Mountain"), "MDT": tz.gettz("US/Mountain"),
+    "PST": tz.gettz("US/Pacific"), "PDT": tz.gettz("US/Pacific"),
+    "MSK": tz.gettz("Europe/Moscow"),
+}
+
+
+@functools.lru_cache(maxsize=8192)
+def parse_pub_date(date_string):
+    """
+    Parse rss pubDate string into datetime object.
+    RSS pubDate uses the RFC 822 format, so the stdlib email parser handles it
+    much faster than dateutil's generic parser; dateutil stays as a fallback
+    for feeds with malformed dates.
+    Results are cached, because every sort and date filter re-parses
+    the same pubDate strings.
+    """
+    try:
+        return parsedate_to_datetime(date_string)
+    except (TypeError, ValueError):
+        return parse(date_string, tzinfos=_TZINFOS)
+
+
+def print_json(data):
+    """
+    Print data as indented json to stdout.
+    With orjson the serialized bytes go straight to the stdout buffer,
+    skipping the bytes-str-bytes round trip that print(json_dumps(...)) pays.
+    """
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        print(json_dumps(data, indent=True))
+
+
+def iter_storage_records(storage_path):
+    """
+    Yield records from legacy jsonl storage file one line at a time.
+    Legacy storage keeps one json document per line: a meta record per source
+    (feed title and conditional GET headers) and one record per item.
+    New storage is sqlite (see package.storage); this reader is kept
+    for migration behind the --legacy-storage flag.
+    """
+    with open(storage_path, "r") as jsonl_file:
+        for line in jsonl_file:
+            line = line.strip()
+            if line:
+                yield json_loads(line)
+
+
+class _BytesRaw(io.BytesIO):
+    """BytesIO subclass that accepts the decode_content flag the parser sets."""
+
+
+class _BytesResponse:
+    """
+    Minimal response stand-in wrapping a body that was downloaded outside
+    the shared session (see Feed.fetch_many), so the streaming parser in
+    Feed.__init__ can consume it like a requests response.
+    """
+    status_code = 200
+
+    def __init__(self, body, headers=None):
+        self.raw = _BytesRaw(body)
+        self.headers = headers if headers is not None else {}
+
+    def close(self):
+        pass
+
+
+class Feed:
+    """
+    A class to represent rss feed.
+
+    Attributes
+    ----------
+    req : requests.models.Response
+        `Response <Response>` object, which contains a server's response to an HTTP request
+    feed_title : str
+        Title of the rss feed
+    feed_items : list
+        contains dictionary with data of each 'item' element of the feed
+    news_count : int
+        count of news in rss feed
+
+    Methods
+    -------
+    get_dict(limit=0):
+        Returns dictionary with 2 keys 'feed_title' and 'items'.
+        'items' contains list if dictionaries for each rss news"
+    get_json_from_feed(limit=0):
+        This method returns news from the feed in json format.
+    get_text_from_feed(limit=0):
+        This method returns human-readable text with news from rss feed.
+    html_to_text(input):
+        This method checks if string has HTML tags, and returns clean text without tags.
+    """
+
+    def __init__(self, rss_url, req=None, stored_dict=None, max_items=0):
+        """
+        Constructs all the necessary attributes for the Feed object.
+
+        Parameters
+        ----------
+        rss_url : url link
+            url link to rss feed
+        req : requests.models.Response, optional
+            already received response for rss_url (to avoid second request in Feed.fetch)
+        stored_dict : dict, optional
+            feed dictionary from storage to reuse when the server answered 304 Not Modified
+        max_items : int, optional
+            stop parsing once this many items are gathered (0 parses the whole feed)
+
+        Attributes
+        ----------
+
+        req : requests.models.Response
+            `Response <Response>` object, which contains a server's response to an HTTP request
+        feed_title : str
+            Title of the rss feed
+        feed_items : list
+            contains dictionary with data of each 'item' element of the feed
+        news_count : int
+            count of news in rss feed
+        source: url
+            url of rss feed
+        """
+
+        try:
+            self.source = rss_url.rstrip("/")
+            self._stored_dict = stored_dict
+            self._cached_dict = None
+            # feed was not modified on the server - reuse items from storage
+            if stored_dict is not None:
+                self.req = req
+                self.feed_title = stored_dict["Feed title"]
+                self.feed_items = []
+                self.news_count = len(stored_dict["items"])
+                logging.debug("Feed '%s' not modified, reusing %s stored items", self.feed_title, self.news_count)
+                return
+            self.req = req if req is not None else _get_session().get(rss_url, stream=True, timeout=_TIMEOUT)
+            # stream the body through the incremental parser: download and parse
+            # overlap, and processed elements are freed right away, so peak memory
+            # stays around one item instead of the whole document
+            self.req.raw.decode_content = True
+            self.feed_title = None
+            self.feed_items = []
+            root_seen = False
+            try:
+                # recover=True keeps the old parser's tolerance: real-world rss
+                # routinely carries undefined entities and similar recoverable
+                # markup errors, which must not kill the whole feed
+                for event, element in etree.iterparse(self.req.raw, events=("start", "end"),
+                                                      recover=True):
+                    if event == "start":
+                        # the root element arrives first - reject non-rss documents
+                        # before downloading the rest of the body
+                        if not root_seen:
+                            root_seen = True
+                            if element.tag != "rss":
+                                raise NotRssLink(f"The source '{rss_url}' do not contain rss feed data")
+                        continue
+                    if element.tag == "item":
+                        self.feed_items.append(Feed._item_to_dict(element))
+                        # fast-iter pattern: free the finished item and the
+                        # already handled siblings before it
+                        element.clear()
+                        while element.getprevious() is not None:
+                            del element.getparent()[0]
+                        if 0 < max_items <= len(self.feed_items):
+                            break
+                    elif self.feed_title is None and element.tag == "title" \
+                            and element.getparent().tag == "channel":
+                        self.feed_title = element.text
+            except etree.XMLSyntaxError:
+                raise NotRssLink(f"The source '{rss_url}' do not contain rss feed data")
+            finally:
+                self.req.close()
+            if not root_seen:
+                raise NotRssLink(f"The source '{rss_url}' do not contain rss feed data")
+            self.news_count = len(self.feed_items)
+            logging.debug("New Feed object '%s' created. "
+                          "Total news count in the feed: %s ", self.feed_title, self.news_count)
+
+        except requests.exceptions.MissingSchema as exc:
+            print(exc)
+            sys.exit()
+        except requests.exceptions.InvalidSchema as exc:
+            print(exc)
+            sys.exit()
+        except requests.exceptions.ConnectionError as exc:
+            print(exc)
+            sys.exit()
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as exc:
+            # the streamed body is read inside iterparse, so mid-download
+            # failures surface as read timeouts or protocol errors from
+            # requests or urllib3 instead of ConnectionError
+            print(exc)
+            sys.exit()
+        except NotRssLink as exc:
+            print(exc)
+            sys.exit()
+
+    @classmethod
+    def fetch(cls, rss_url, file_name="storage.db", max_items=0):
+        """
+        Construct a Feed object using http conditional GET.
+        If ETag or Last-Modified headers for the source are found in the storage database,
+        they are sent as If-None-Match / If-Modified-Since, so an unchanged feed
+        answers 304 with no body and the stored items are reused without reparsing.
+        args:
+            rss_url: url link to rss feed
+            file_name: name of storage database with previously fetched feeds
+            max_items: stop parsing once this many items are gathered (0 parses the whole
+                       feed; keep 0 when the feed will be written to storage)
+        """
+        source = rss_url.rstrip("/")
+        headers = {}
+        meta = None
+        storage_path = str(_PKG_ROOT / file_name)
+        # nothing stored yet - fall back to the plain constructor
+        if not os.path.exists(storage_path):
+            return cls(rss_url, max_items=max_items)
+        conn = storage.connect(storage_path)
+        try:
+            meta = storage.load_meta(conn, source)
+            if meta:
+                if meta.get('ETag'):
+                    headers['If-None-Match'] = meta['ETag']
+                if meta.get('Last-Modified'):
+                    headers['If-Modified-Since'] = meta['Last-Modified']
+            # nothing stored for this source - fall back to the plain constructor
+            if not headers:
+                return cls(rss_url, max_items=max_items)
+            try:
+                req = _get_session().get(rss_url, headers=headers, stream=True, timeout=_TIMEOUT)
+            except requests.exceptions.RequestException as exc:
+                print(exc)
+                sys.exit()
+            if req.status_code == 304:
+                logging.debug("Server returned 304 Not Modified for '%s'", source)
+                stored_feed = {"Feed title": meta.get("Feed title"), "Source": source,
+                               "ETag": meta.get("ETag"), "Last-Modified": meta.get("Last-Modified"),
+                               "items": storage.load_items(conn, source)}
+                return cls(rss_url, req=req, stored_dict=stored_feed)
+            return cls(rss_url, req=req, max_items=max_items)
+        finally:
+            conn.close()
+
+    @classmethod
+    async def _afetch(cls, urls):
+        """Download all urls concurrently and return (url, body, headers) tuples."""
+        async with aiohttp.ClientSession() as session:
+            async def fetch_one(url):
+                async with session.get(url) as resp:
+                    return url, await resp.read(), dict(resp.headers)
+            return await asyncio.gather(*(fetch_one(url) for url in urls))
+
+    @classmethod
+    def _parse_bytes(cls, downloaded):
+        """
+        Build a Feed object from an already downloaded (url, body, headers) tuple.
+        Runs in worker processes from fetch_many; the response shim is dropped
+        afterwards so the instance stays picklable.
+        """
+        url, body, headers = downloaded
+        feed = cls(url, req=_BytesResponse(body, headers))
+        feed.req = None
+        return feed
+
+    @classmethod
+    def fetch_many(cls, urls):
+        """
+        Construct Feed objects for several urls at once.
+        The downloads run concurrently on one aiohttp session, then the
+        CPU-bound xml parsing is spread over worker processes, so neither
+        the network waits nor the parses run serially.
+        args:
+            urls: list of rss feed urls
+        """
+        if aiohttp is None:
+            # no aiohttp - overlap at least the network round trips in threads
+            with ThreadPoolExecutor(max_workers=min(8, len(urls) or 1)) as executor:
+                return list(executor.map(cls, urls))
+        try:
+            downloads = asyncio.run(cls._afetch(urls))
+        except aiohttp.ClientError as exc:
+            print(exc)
+            sys.exit()
+        with ProcessPoolExecutor() as pool:
+            return list(pool.map(cls._parse_bytes, downloads))
+
+    @staticmethod
+    def _item_to_dict(item):
+        """
+        Build dictionary with data of one 'item' element.
+        args:
+            item: lxml 'item' element of the feed
+        """
+        item_dict = {}
+        # the '*' wildcard yields only real elements,
+        # comments and processing instructions are filtered out by lxml itself
+        for el in item.iterchildren('*'):
+            # get data from elements that contains text
+            if el.text and el.text.strip():
+                item_dict[etree.QName(el).localname] = Feed.html_to_text(el.text)
+            # get data from elements that contains url
+            elif el.get('url'):
+                item_dict[etree.QName(el).localname] = el.get("url")
+        return item_dict
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def html_to_text(input):
+        """
+        Cleaning text from html tags.
+        Results are cached, because identical strings (empty descriptions,
+        repeated categories) show up many times across feed items.
+
+        Parameters: input (str): string data
+        Returns: String without html tags
+
+        """
+        # the legacy entity pass runs first (it removes &nbsp even without a
+        # semicolon), then html.unescape decodes everything else, matching the
+        # entity handling the old html-parser implementation provided
+        # fast path: plain text without tags does not need tag stripping at all
+        if "<" not in input:
+            return html.unescape(ENTITIES_RE.sub("", input))
+        return html.unescape(ENTITIES_RE.sub("", TAG_RE.sub("", input)))
+
+    def _build_dict(self):
+        """
+        Build the full feed dictionary with title and sorted items.
+        Called once per instance through the get_dict cache.
+        """
+        feed_dict = {"Feed title": self.feed_title, "Source": self.source}
+        # feed was not modified on the server - reuse items from storage, but
+        # sort them like parsed ones: they arrive in insertion order, and the
+        # stored pubDate column is date-granular, so the full pubDate decides
+        if self._stored_dict is not None:
+            feed_dict['items'] = sorted(self._stored_dict['items'],
+                                        key=lambda x: parse_pub_date(x['pubDate']), reverse=True)
+            return feed_dict
+        # items are already plain dictionaries built during streamed parsing
+        # sorting items by date
+        feed_dict['items'] = sorted(self.feed_items, key=lambda x: parse_pub_date(x['pubDate']), reverse=True)
+        return feed_dict
+
+    def get_dict(self, limit=0):
+        """
+        This method returns dictionary with title and items from Feed object.
+        The sorted feed dictionary is built once and cached on the instance,
+        so html, fb2 and stdout output do not redo the work; each call returns
+        a shallow copy, keeping caller slicing away from the cache.
+        limit (optional argument) - quantity of news to display (if limit is not set then include all news )
+        """
+        logging.debug("Function 'get_dict' started. Limit: %s", limit)
+
+        feed_dict = self._cached_dict
+        if feed_dict is None:
+            feed_dict = self._build_dict()
+            self._cached_dict = feed_dict
+        # slice data for limited output
+        if limit > 0:
+            return {**feed_dict, 'items': feed_dict['items'][:limit]}
+        return dict(feed_dict)
+
+    def print_json_from_feed(self, limit=0):
+        """
+        This method returns news from source feed in json format.
+        limit (optional argument)  - quantity of news to display (if limit is not set then all news will be displayed)
+        """
+        logging.debug("Function 'print_json_from_feed' started.")
+
+        logging.debug("Creating of json completed. Count of news in json output: %s",
+                      limit if self.news_count > limit > 0 else self.news_count)
+        print_json(self.get_dict(limit))
+
+    def print_text_from_feed(self, limit=0):
+        """
+        This method returns human-readable news from rss feed.
+        limit (optional argument) - quantity of news to display
+                                    (if limit is not set then all news will be displayed)
+        """
+        logging.debug("Function 'print_text_from_feed' started.")
+
+        feed_dict = self.get_dict(limit)
+
+        # collect output in a list and join once - linear instead of quadratic concatenation
+        parts = [f"\nFeed: {self.feed_title}\n" + "_" * (len(self.feed_title) + 6) + "\n\n"]
+        for item in feed_dict['items']:
+            for key in item.keys():
+                if item[key] != "":
+                    parts.append(f"{key.capitalize()}: {item[key]}\n")
+            parts.append(f"\n{'*'*80}\n")
+        output = "".join(parts)
+        logging.debug("Creating of text completed. Count of news in text output: %s",
+                      limit if self.news_count > limit > 0 else self.news_count)
+        print(output)
+
+    @staticmethod
+    def add_pub_date_iso(items):
+        """
+        Add 'pubDateISO' key with publication date in ISO format to each item.
+        The date is computed once on write, so date queries in read_from_database
+        become plain string comparison instead of dateutil parsing per item.
+        """
+        for item in items:
+            if 'pubDateISO' not in item and 'pubDate' in item:
+                item['pubDateISO'] = parse_pub_date(item['pubDate']).date().isoformat()
+
+    def get_storage_dict(self):
+        """
+        Returns feed dictionary extended with ETag and Last-Modified response headers,
+        so the next fetch of the same source can use http conditional GET.
+        """
+        feed_dict = self.get_dict()
+        # copy the items before stamping pubDateISO, so the storage-only key
+        # does not leak into the cached dictionary used for stdout and files
+        feed_dict['items'] = [dict(item) for item in feed_dict['items']]
+        Feed.add_pub_date_iso(feed_dict['items'])
+        if self.req is not None:
+            feed_dict["ETag"] = self.req.headers.get("ETag")
+            feed_dict["Last-Modified"] = self.req.headers.get("Last-Modified")
+        # a 304 response may omit the validators - keep the stored ones,
+        # otherwise save_feed would overwrite them with NULL and disable
+        # conditional GET from the next run on
+        if self._stored_dict is not None:
+            if not feed_dict.get("ETag"):
+                feed_dict["ETag"] = self._stored_dict.get("ETag")
+            if not feed_dict.get("Last-Modified"):
+                feed_dict["Last-Modified"] = self._stored_dict.get("Last-Modified")
+        return feed_dict
+
+    def write_to_database(self, file_name):
+        """
+        Write new items to sqlite storage.
+        Already stored items are skipped by the (source, guid) primary key,
+        so the update inserts only new rows inside one transaction.
+        Args:
+            file_name: name of storage database
+        """
+        logging.debug("Starting 'write_to_database' function for Feed instance '%s'", self.feed_title)
+        storage_path = str(_PKG_ROOT / file_name)
+        # walk feed items only once - every use below works with this dictionary
+        current = self.get_storage_dict()
+
+        conn = storage.connect(storage_path)
+        try:
+            news_added = storage.save_feed(conn, current)
+        finally:
+            conn.close()
+        logging.debug("Data from '%s' added to the storage. "
+                      "Count of news added:%s", self.feed_title, news_added)
+
+    @staticmethod
+    def read_from_database(date, file_name, source=None,):
+        """
+        This function read data from sqlite storage and returns data filtered by date and source"
+        If source is not not set, then it returns list of dictionaries from all sources with data filtered by date.
+        The date filter runs as an indexed sql query, so only matching rows are read.
+        args:
+            date: date in "%Y%m%d" format (Example: 20211027).
+            file_name: name of storage database.
+            source: feed url, for which we wand to get data.
+        """
+        logging.debug("Starting 'read_from_database' function with params: date=%s,source=%s", date, source)
+        # compute requested date once instead of parsing it per item in the loops below
+        target_date = datetime.strptime(date, "%Y%m%d").date()
+        target_iso = target_date.isoformat()
+        # create relative path to storage
+        storage_path = str(_PKG_ROOT / file_name)
+
+        if not os.path.exists(storage_path):
+            print("No storage detected. Please run rss_reader with source argument first to create storage.")
+            sys.exit()
+        conn = storage.connect(storage_path)
+        try:
+            feed_titles = storage.load_titles(conn)
+            items_by_source = storage.load_items_by_date(conn, target_iso, source)
+        finally:
+            conn.close()
+        if not feed_titles:
+            print(f"No data in the file '{storage_path}'.")
+            sys.exit()
+        logging.debug("Data from '%s' read", storage_path)
+        logging.debug("Feeds in database: '%s'", list(feed_titles.values()))
+
+        return Feed._build_feeds_on_date(feed_titles, items_by_source, target_date, source)
+
+    @staticmethod
+    def read_from_legacy_storage(date, file_name, source=None,):
+        """
+        Read data filtered by date and source from the legacy jsonl storage file.
+        Kept behind the --legacy-storage flag for migration from versions
+        that stored feeds in jsonl instead of sqlite.
+        args:
+            date: date in "%Y%m%d" format (Example: 20211027).
+            file_name: name of legacy storage file.
+            source: feed url, for which we wand to get data.
+        """
+        logging.debug("Starting 'read_from_legacy_storage' function with params: date=%s,source=%s", date, source)
+        # compute requested date once instead of parsing it per item in the loops below
+        target_date = datetime.strptime(date, "%Y%m%d").date()
+        target_iso = target_date.isoformat()
+        # create relative path to storage
+        storage_path = str(_PKG_ROOT / file_name)
+
+        # stream storage line by line and filter by date in-flight,
+        # so the whole history is never materialized in memory
+        feed_titles = {}
+        items_by_source = {}
+        try:
+            records_found = False
+            for record in iter_storage_records(storage_path):
+                records_found = True
+                record_source = record['Source']
+                if 'item' in record:
+                    item = record['item']
+                    # pubDateISO is precomputed on write; parse only legacy items without it
+                    item_date = item.pop('pubDateISO', None) \
+                        or parse_pub_date(item['pubDate']).date().isoformat()
+                    if item_date == target_iso:
+                        # the popped key stays out of the item - it is
+                        # storage-only and must not reach user output
+                        items_by_source.setdefault(record_source, []).append(item)
+                else:
+                    # meta record with feed title and conditional GET headers
+                    feed_titles[record_source] = record.get('Feed title')
+            if not records_found:
+                print(f"No data in the file '{storage_path}'.")
+                sys.exit()
+            logging.debug("Data from '%s' read", storage_path)
+            logging.debug("Feeds in database: '%s'", list(feed_titles.values()))
+        except json.decoder.JSONDecodeError:
+            print(f"No data in the file '{storage_path}'.")
+            sys.exit()
+        except FileNotFoundError:
+            print("No storage detected. Please run rss_reader with source argument first to create storage.")
+            sys.exit()
+
+        return Feed._build_feeds_on_date(feed_titles, items_by_source, target_date, source)
+
+    @staticmethod
+    def _build_feeds_on_date(feed_titles, items_by_source, target_date, source=None):
+        """
+        Build the output feed list from stored titles and date-filtered items.
+        Shared by the sqlite and legacy jsonl readers.
+        """
+        # get news by date for all sources
+        try:
+            if not source:
+                output_list = []
+                for record_source, items_on_date in items_by_source.items():
+                    sorted_items = sorted(items_on_date,
+                                          key=lambda x: parse_pub_date(x['pubDate']),
+                                          reverse=True)
+                    logging.debug("The feed '%s' has %s items on the date - %s.",
+                                  feed_titles.get(record_source), len(items_on_date), target_date)
+                    new_dict = {
+                        "Feed title": feed_titles.get(record_source),
+                        "Source": record_source,
+                        "items": sorted_items,
+                    }
+                    output_list.append(new_dict)
+                    logging.debug("List with %s feeds created.", len(output_list))
+                if output_list:
+                    return output_list
+                else:
+                    raise NoNewsFound(f"No news were found in storage for all feeds "
+                                      f"on the date {target_date} ")
+        except NoNewsFound as exc:
+            print(exc)
+            sys.exit()
+
+        # get news by source and date
+        try:
+            if source in feed_titles or source in items_by_source:
+                items_on_date = items_by_source.get(source, [])
+                logging.debug("Number of news for requested date:%s", len(items_on_date))
+                if not items_on_date:
+                    raise NoNewsFound(f"No news were found in storage for feed '{feed_titles.get(source)}' "
+                                      f"on the date {target_date} ")
+                sorted_items = sorted(items_on_date,
+                                      key=lambda x: parse_pub_date(x['pubDate']),
+                                      reverse=True)
+                new_dict = {
+                    "Feed title": feed_titles.get(source),
+                    "Source": source,
+                    "items": sorted_items,
+                }
+                logging.debug("Feed '%s' received from storage."
+                              "The Feed contain %s items.", new_dict['Feed title'], len(new_dict['items']))
+                return [new_dict]
+        except NoNewsFound as exc:
+            print(exc)
+            sys.exit()
+
+    @staticmethod
+    def print_data_json(feed_list, limit=0):
+        """
+        This method prints news from list of feeds.
+        args:
+            feed_list: list of feeds received from storage.
+            limit (optional): quantity of news from each feed to display (if limit is not set then
+                              all news will be displayed)
+        """
+        logging.debug("Function 'print_data_json' started. Input data type: %s", type(feed_list))
+        try:
+            if limit > 0:
+                for feed in feed_list:
+                    feed['items'] = feed['items'][:limit]
+            print_json(feed_list)
+        except TypeError:
+            print("There is no data for this source in the storage.")
+            sys.exit()
+
+    @staticmethod
+    def get_text_from_storage(feed_list, limit=0):
+        """
+        This method prints news from feeds list in human-readable format.
+        feed_list: list of feeds received from storage.
+        limit (optional): quantity of news from each feed to display (if limit is not set then
+                          all news will be displayed)
+        """
+        logging.debug("Function 'get_text_from_storage' started. Input data type: %s", type(feed_list))
+
+        try:
+            if limit > 0:
+                for feed in feed_list:
+                    feed['items'] = feed['items'][:limit]
+            # collect output in a list and join once - linear instead of quadratic concatenation
+            parts = []
+            for feed in feed_list:
+                parts.append(f"\nFeed: {feed['Feed title']}\n" + "-" * 80 + "\n")
+                for item in feed['items']:
+                    for key in item.keys():
+                        if item[key] != "":
+                            parts.append(f"{key.capitalize()}: {item[key]}\n")
+                    parts.append(f"\n{'*' * 80}\n")
+            return "".join(parts)
+
+        except TypeError:
+            print("There is no data for this source in the storage.")
+            sys.exit()
+
+    def __str__(self):
+        return f"Rss feed {self.feed_title}"
+
+
+class NotRssLink(Exception):
+    """Exception class for urls that do not contain rss data"""
+
+
+class NoNewsFound(Exception):
+    """Exception occurs when news were not found by the date"""
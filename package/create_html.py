@@ -1,109 +1,127 @@
-"""This module contains all functions to create html file from rss feed"""
-from package.RssFeed import Feed
-import mimetypes
-import logging
-import sys
-import os
-from pathlib import Path
-import requests
-
-
-def create_html(feeds_source, path, limit=0):
-    """
-    The function creates html web page from feeds stored in database or feeds loaded from web link.
-    Params:
-        feeds_source: list of dictionaries with rss feed data or 1 dictionary with rss feed data.
-        path: full path to directory to save html file.
-        limit: (optional): quantity of news from each feed to write to html file (if limit is not set then
-                      all news will be displayed)
-    """
-    logging.debug(f"Start 'create_html' function.")
-    file_name = "rss_feed.html"
-    full_path = Path(path) / file_name
-
-    # create feeds_list
-    feeds_list = create_list_of_feeds(feeds_source)
-
-    try:
-        # slice data for limited output
-        if limit > 0:
-            for feed in feeds_list:
-                feed['items'] = feed['items'][:limit]
-        output = "<!DOCTYPE html>\n<html>\n<body>\n"
-
-        # create table of content
-        output += "<h1>Feeds:\n</h1>"
-        for feed in feeds_list:
-            output += f"<h2>\n<a href='#{feed['Feed title']}'> {feed['Feed title']} </a>\n</h2>"
-        output += f"\n{'*' * 50}\n"  # add line for visual separation
-
-        # create main part of html
-        for feed in feeds_list:
-            output += f"<h2 id='{feed['Feed title']}'>Feed: {feed['Feed title']}</h2>\n"
-            for item in feed['items']:
-                for key in item.keys():
-                    # add title for each item
-                    if key == "title":
-                        output += f"<h3><b><u>{key.capitalize()}</b>: {item[key]}</u></h3>\n"
-                    # add links
-                    elif key == "link":
-                        output += f"<p><b>{key.capitalize()}</b>: " \
-                                  f"<a href='{item[key]}'>{item[key]}</a></p>\n"
-                    # add images
-                    elif is_valid_url_image(item[key]):
-                        output += f"<p><b>{key.capitalize()}:</b></p>\n" \
-                                  f"<img src='{item[key]}' alt='image' width='300' height='200'>" \
-                                  f'<br>'
-                    # add all other non empty elements
-                    elif item[key] != "":
-                        output += f"<p><b>{key.capitalize()}</b>: {item[key]}</p>\n"
-                output += f"\n{'*' * 50}\n"  # add line for visual separation
-        output += "</body>\n</html>"
-
-        # save file
-        with open(full_path, 'w', encoding='utf-8') as f:
-            f.write(output)
-        logging.debug(f"Html file created. File path: '{path}")
-
-    except TypeError:
-        print("There is no data for this source.")
-        sys.exit()
-    except FileNotFoundError:
-        print("Invalid directory you specified with args.to_html")
-        sys.exit()
-    except PermissionError as exc:
-        print(exc)
-        sys.exit()
-    else:
-        logging.debug(f"No exception raised in 'create html' function")
-
-
-def create_list_of_feeds(data):
-    """
-    This function make list of feeds from different types of input data
-    Args:
-        data: list of dictionaries or 1 dictionary with feeds data
-    """
-    if isinstance(data, dict):
-        logging.debug(f"Received feeds type - 'dict'")
-        return [data]
-    elif isinstance(data, list):
-        logging.debug(f"Received feeds type - 'list'")
-        return data
-
-
-def is_valid_url_image(url):
-    """Check if web url contain image and exists on internet"""
-    mimetype, encoding = mimetypes.guess_type(url)
-
-    # can't read mimetype for images from yahoo web storage that starts with https://s.yimg.com/
-    return (mimetype and mimetype.startswith('image')) or "https://s.yimg.com/" in url
-
-
-if __name__ == "__main__":
-    logging.basicConfig(level=logging.DEBUG)
-    new_feed = Feed("https://tech.onliner.by/feed")
-    new_feed2 = Feed("https://3dnews.ru/hardware-news/rss")
-    new_feed3 = Feed("https://news.yahoo.com/rss/")
-    data_list = [new_feed.get_dict(), new_feed2.get_dict(), new_feed3.get_dict()]
-    create_html(data_list, "C:/Users/PS/Desktop/123")
+"""This module contains all functions to create html file from rss feed"""
+from package.RssFeed import Feed
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import functools
+import logging
+import re
+import sys
+import os
+from pathlib import Path
+import requests
+
+# image file extensions in one precompiled regex - a single pass over the url
+# instead of a mimetype table lookup per call
+_IMG_RE = re.compile(r"\.(?:jpe?g|png|gif|webp|bmp|svg)(?:[?#]|$)", re.IGNORECASE)
+
+# cached capitalize for key names, which repeat for every item of the feed
+capitalize_key = functools.lru_cache(maxsize=None)(str.capitalize)
+
+# markup for keys with fixed formatting, dispatched by dict lookup instead of
+# re-testing every key with the if/elif chain inside the item loop
+HTML_FORMATTERS = {
+    "title": lambda value: f"<h3><b><u>Title</b>: {value}</u></h3>\n",
+    "link": lambda value: f"<p><b>Link</b>: <a href='{value}'>{value}</a></p>\n",
+}
+
+
+def create_html(feeds_source, path, limit=0):
+    """
+    The function creates html web page from feeds stored in database or feeds loaded from web link.
+    Params:
+        feeds_source: list of dictionaries with rss feed data or 1 dictionary with rss feed data.
+        path: full path to directory to save html file.
+        limit: (optional): quantity of news from each feed to write to html file (if limit is not set then
+                      all news will be displayed)
+    """
+    logging.debug("Start 'create_html' function.")
+    file_name = "rss_feed.html"
+    full_path = Path(path) / file_name
+
+    # create feeds_list
+    feeds_list = create_list_of_feeds(feeds_source)
+
+    try:
+        # limited output is handled by islice below - no sliced copies,
+        # and the shared feeds_source dictionaries stay unmodified
+        render_limit = limit if limit > 0 else None
+        # stream output pieces straight into the file, so the whole document
+        # is never held in memory; large write buffer keeps syscalls rare
+        with open(full_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write("<!DOCTYPE html>\n<html>\n<body>\n")
+
+            # create table of content
+            f.write("<h1>Feeds:\n</h1>")
+            for feed in feeds_list:
+                f.write(f"<h2>\n<a href='#{feed['Feed title']}'> {feed['Feed title']} </a>\n</h2>")
+            f.write(f"\n{'*' * 50}\n")  # add line for visual separation
+
+            # create main part of html
+            for feed in feeds_list:
+                f.write(f"<h2 id='{feed['Feed title']}'>Feed: {feed['Feed title']}</h2>\n")
+                for item in islice(feed['items'], render_limit):
+                    for key in item.keys():
+                        # add titles and links through the precompiled formatters
+                        formatter = HTML_FORMATTERS.get(key)
+                        if formatter:
+                            f.write(formatter(item[key]))
+                        # add images
+                        elif is_valid_url_image(item[key]):
+                            f.write(f"<p><b>{capitalize_key(key)}:</b></p>\n"
+                                    f"<img src='{item[key]}' alt='image' width='300' height='200'>"
+                                    f'<br>')
+                        # add all other non empty elements
+                        elif item[key] != "":
+                            f.write(f"<p><b>{capitalize_key(key)}</b>: {item[key]}</p>\n")
+                    f.write(f"\n{'*' * 50}\n")  # add line for visual separation
+            f.write("</body>\n</html>")
+        logging.debug("Html file created. File path: '%s", path)
+
+    except TypeError:
+        print("There is no data for this source.")
+        sys.exit()
+    except FileNotFoundError:
+        print("Invalid directory you specified with args.to_html")
+        sys.exit()
+    except PermissionError as exc:
+        print(exc)
+        sys.exit()
+    else:
+        logging.debug("No exception raised in 'create html' function")
+
+
+def create_list_of_feeds(data):
+    """
+    This function make list of feeds from different types of input data
+    Args:
+        data: list of dictionaries or 1 dictionary with feeds data
+    """
+    if isinstance(data, dict):
+        logging.debug("Received feeds type - 'dict'")
+        return [data]
+    elif isinstance(data, list):
+        logging.debug("Received feeds type - 'list'")
+        return data
+
+
+@functools.lru_cache(maxsize=8192)
+def is_valid_url_image(url):
+    """Check if web url contain image and exists on internet"""
+    # fast path: item values that are clearly not urls don't need a regex scan
+    if "://" not in url or "." not in url:
+        return False
+
+    # image urls from yahoo web storage start with https://s.yimg.com/ and carry no extension
+    return _IMG_RE.search(url) is not None or "https://s.yimg.com/" in url
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    urls = ["https://tech.onliner.by/feed",
+            "https://3dnews.ru/hardware-news/rss",
+            "https://news.yahoo.com/rss/"]
+    # fetch feeds in parallel because requests.get is network-bound
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        feeds = list(executor.map(Feed, urls))
+    data_list = [feed.get_dict() for feed in feeds]
+    create_html(data_list, "C:/Users/PS/Desktop/123")
@@ -1,116 +1,145 @@
-"""This module contains all functions to create fb2 file from rss feed data"""
-
-from package.create_html import is_valid_url_image
-from package.create_html import create_list_of_feeds
-from package.RssFeed import Feed
-import logging
-import sys
-from pathlib import Path
-import base64
-import requests
-
-
-def create_fb2(feeds_source, path, limit=0):
-    """
-        The function creates fb2 file from data contain feeds.
-        Params:
-            feeds_source: list of dictionaries with rss feed data or 1 dictionary with rss feed data.
-            path: full path to directory where fb2 file will be saved.
-            limit: (optional): quantity of news from each feed to write to html file (if limit is not set then
-                               all news will be displayed)
-        """
-    logging.debug(f"Start 'create_fb2' function.")
-
-    file_name = "rss_reader_book.fb2"
-    full_path = Path(path) / file_name
-    logging.debug(f"Start 'create_fb2' function.")
-    cover_image_url = "http://booknerdalert.com/wp-content/uploads/2020/07/BookNews-tablet-print-1-768x632.jpg"
-
-    # create feeds_list
-    feeds_list = create_list_of_feeds(feeds_source)
-
-    try:
-        # slice data for limited output
-        if limit > 0:
-            for feed in feeds_list:
-                feed['items'] = feed['items'][:limit]
-
-        output = (
-            """
-            <?xml version="1.0" encoding="UTF-8"?>
-            <FictionBook xmlns="http://www.gribuser.ru/xml/fictionbook/2.0" xmlns:l="http://www.w3.org/1999/xlink">
-            <coverpage><image l:href="#cover.png"/></coverpage>
-            <body>
-            """)
-        pictures = ""  # variable for storing images in binary format
-        image_num = 0  # number for each image in the document
-
-        for feed in feeds_list:
-            # create feed title and start section for it
-            output += f"<section><title><strong>Feed: {feed['Feed title']}</strong></title>\n"
-            for item in feed['items']:
-                for key in item.keys():
-                    # add title for each item
-                    if key == "title":
-                        output += f"<section><title><strong>{item[key]}</strong></title>"
-                    # add images
-                    elif is_valid_url_image(item[key]):
-                        # Get image encoded to base64 as text from url
-                        encoded_image = get_as_base64_text(item[key])
-                        output += (f"<p><strong>{key.capitalize()}:</strong></p>\n" 
-                                   f"<image l:href=\"#_{image_num}.jpg\"/>")
-                        pictures += f"<binary content-type=\"image/jpeg\" " \
-                                    f"id=\"_{image_num}.jpg\">{encoded_image}</binary>"
-                        image_num += 1
-                    # add links
-                    elif key == "link":
-                        output += f"<p><strong>{key.capitalize()}</strong>: " \
-                                  f"<a l:href='{item[key]}'>{item[key]}</a></p>\n"
-                    # add all other item elements that are not empty
-                    elif item[key] != "":
-                        output += f"<p><strong>{key.capitalize()}</strong>: {item[key]}</p>\n"
-                output += f"\n{'*' * 50}\n"  # add line for visual separation of items
-                output += "</section>"  # finish section for item in feed
-            output += "</section>"  # finish section for feed
-        output += "</body>"
-        cover_image = f"<binary content-type=\"image/png\" " \
-                      f"id=\"cover.png\">{get_as_base64_text(cover_image_url)}</binary>"
-        output += cover_image
-        output += pictures
-        output += "</FictionBook>"
-        # save file
-        with open(full_path, 'w', encoding='utf-8') as f:
-            f.write(output)
-        logging.debug(f"{file_name } file created. File path: '{path}'")
-
-    except TypeError as exc:
-        print(exc)
-        print("There is no data for this source.")
-        sys.exit()
-    except FileNotFoundError:
-        print("Invalid directory you specified with args.to_fb2")
-        sys.exit()
-    except PermissionError as exc:
-        print(exc)
-        sys.exit()
-    else:
-        logging.debug(f"No exception raised in 'create fb2' function")
-
-
-def get_as_base64_text(url):
-    """
-    Function converting image from web url to binary base64 encoded format as text without b and ' symbols.
-    args:
-        url - web url that contains image
-    """
-    binary_data = base64.b64encode(requests.get(url).content)
-    return str(binary_data).replace("b'", "").replace("'", "")
-
-
-if __name__ == "__main__":
-    logging.basicConfig(level=logging.DEBUG)
-    new_feed = Feed("https://tech.onliner.by/feed")
-    new_feed2 = Feed("https://3dnews.ru/hardware-news/rss")
-    new_feed3 = Feed("https://news.yahoo.com/rss/")
-    data_list = [new_feed.get_dict(), new_feed3.get_dict()]
-    create_fb2(new_feed3.get_dict(), "C:/Users/PS/Desktop/123", 5)
+"""This module contains all functions to create fb2 file from rss feed data"""
+
+from package.create_html import is_valid_url_image
+from package.create_html import create_list_of_feeds
+from package.create_html import capitalize_key
+from package.RssFeed import Feed
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import logging
+import sys
+from pathlib import Path
+import base64
+import requests
+
+# shared session with a connection pool, so parallel image downloads from the
+# same CDN reuse TCP/TLS connections instead of reconnecting per image
+_session = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=8, pool_maxsize=8,
+    max_retries=requests.adapters.Retry(total=3, backoff_factor=0.3))
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# markup for keys with fixed formatting, dispatched by dict lookup instead of
+# re-testing every key with the if/elif chain inside the item loop
+FB2_FORMATTERS = {
+    "title": lambda value: f"<section><title><strong>{value}</strong></title>",
+    "link": lambda value: f"<p><strong>Link</strong>: <a l:href='{value}'>{value}</a></p>\n",
+}
+
+
+def create_fb2(feeds_source, path, limit=0):
+    """
+        The function creates fb2 file from data contain feeds.
+        Params:
+            feeds_source: list of dictionaries with rss feed data or 1 dictionary with rss feed data.
+            path: full path to directory where fb2 file will be saved.
+            limit: (optional): quantity of news from each feed to write to html file (if limit is not set then
+                               all news will be displayed)
+        """
+    logging.debug("Start 'create_fb2' function.")
+
+    file_name = "rss_reader_book.fb2"
+    full_path = Path(path) / file_name
+    logging.debug("Start 'create_fb2' function.")
+    cover_image_url = "http://booknerdalert.com/wp-content/uploads/2020/07/BookNews-tablet-print-1-768x632.jpg"
+
+    # create feeds_list
+    feeds_list = create_list_of_feeds(feeds_source)
+
+    try:
+        # limited output is handled by islice below - no sliced copies,
+        # and the shared feeds_source dictionaries stay unmodified
+        render_limit = limit if limit > 0 else None
+
+        pictures = []  # list for storing images in binary format, written after the body
+        image_num = 0  # number for each image in the document
+
+        # collect all image urls first (cover included) and download them in parallel,
+        # so the build loop below does not block on network for each image
+        image_urls = [cover_image_url]
+        for feed in feeds_list:
+            for item in islice(feed['items'], render_limit):
+                for key in item.keys():
+                    if key != "title" and is_valid_url_image(item[key]):
+                        image_urls.append(item[key])
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            encoded_images = dict(zip(image_urls, executor.map(get_as_base64_text, image_urls)))
+
+        # stream the document straight into the file - only the binary image
+        # sections are buffered, because they must follow the body
+        with open(full_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(
+                """
+                <?xml version="1.0" encoding="UTF-8"?>
+                <FictionBook xmlns="http://www.gribuser.ru/xml/fictionbook/2.0" xmlns:l="http://www.w3.org/1999/xlink">
+                <coverpage><image l:href="#cover.png"/></coverpage>
+                <body>
+                """)
+            for feed in feeds_list:
+                # create feed title and start section for it
+                f.write(f"<section><title><strong>Feed: {feed['Feed title']}</strong></title>\n")
+                for item in islice(feed['items'], render_limit):
+                    for key in item.keys():
+                        # add titles and links through the precompiled formatters
+                        formatter = FB2_FORMATTERS.get(key)
+                        if formatter:
+                            f.write(formatter(item[key]))
+                        # add images
+                        elif is_valid_url_image(item[key]):
+                            # Get image encoded to base64 as text from prefetched images
+                            encoded_image = encoded_images[item[key]]
+                            f.write(f"<p><strong>{capitalize_key(key)}:</strong></p>\n"
+                                    f"<image l:href=\"#_{image_num}.jpg\"/>")
+                            pictures.append(f"<binary content-type=\"image/jpeg\" "
+                                            f"id=\"_{image_num}.jpg\">{encoded_image}</binary>")
+                            image_num += 1
+                        # add all other item elements that are not empty
+                        elif item[key] != "":
+                            f.write(f"<p><strong>{capitalize_key(key)}</strong>: {item[key]}</p>\n")
+                    f.write(f"\n{'*' * 50}\n")  # add line for visual separation of items
+                    f.write("</section>")  # finish section for item in feed
+                f.write("</section>")  # finish section for feed
+            f.write("</body>")
+            f.write(f"<binary content-type=\"image/png\" "
+                    f"id=\"cover.png\">{encoded_images[cover_image_url]}</binary>")
+            for picture in pictures:
+                f.write(picture)
+            f.write("</FictionBook>")
+        logging.debug("%s file created. File path: '%s'", file_name, path)
+
+    except TypeError as exc:
+        print(exc)
+        print("There is no data for this source.")
+        sys.exit()
+    except FileNotFoundError:
+        print("Invalid directory you specified with args.to_fb2")
+        sys.exit()
+    except PermissionError as exc:
+        print(exc)
+        sys.exit()
+    else:
+        logging.debug("No exception raised in 'create fb2' function")
+
+
+def get_as_base64_text(url):
+    """
+    Function converting image from web url to base64 encoded text.
+    args:
+        url - web url that contains image
+    """
+    # decode('ascii') gives the base64 text directly, without the extra copies
+    # that str(bytes) + replace produced
+    return base64.b64encode(_session.get(url, timeout=10).content).decode("ascii")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    urls = ["https://tech.onliner.by/feed",
+            "https://3dnews.ru/hardware-news/rss",
+            "https://news.yahoo.com/rss/"]
+    # fetch feeds in parallel because requests.get is network-bound
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        feeds = list(executor.map(Feed, urls))
+    create_fb2(feeds[2].get_dict(), "C:/Users/PS/Desktop/123", 5)
@@ -1,145 +1,200 @@
-"""This module contains main code to run rss_reader command-line program."""
-
-from package.RssFeed import Feed
-from package.create_html import create_html
-from package.fb2 import create_fb2
-import argparse
-import logging
-from datetime import datetime
-from pathlib import Path
-
-parser = argparse.ArgumentParser(description="Get news from rss feed")
-parser.add_argument("--version", action="version", version="Rss reader version 4.0")
-parser.add_argument("--limit", default=0, type=int, help="Limit of news to display.")
-parser.add_argument("--json", action="store_true", help="Print result as JSON in stdout.")
-parser.add_argument("--verbose", action="store_true", help="Outputs verbose status messages.")
-parser.add_argument("--date", type=str, help="Publishing date of news to display.")
-parser.add_argument("--to_html", type=str, help="Create html file with news from rss feed.")
-parser.add_argument("--to_fb2", type=str, help="Create fb2 file with news from rss feed.")
-parser.add_argument("source", type=str, nargs="?", help="Rss feed url", default=None)
-args = parser.parse_args()
-
-
-def main():
-    """
-    Main function to run rss_reader command-line program.
-    """
-    date_format = "%Y%m%d"
-    storage_file = "storage.json"
-
-    # remove dash for correct storing used sources when loading data from database
-    if args.source:
-        args.source = args.source.rstrip("/")
-
-    if args.verbose:
-        logging.basicConfig(level=logging.DEBUG)
-
-    if not args.source and not args.date:
-        logging.debug(f"Args.source: {args.source}")
-        logging.debug(f"Args.date: {args.date}")
-        print("At least one arguments are required: source or date.")
-        print("usage: rss_reader [-h] [--version] [--limit LIMIT] [--json] [--verbose] "
-              "[--date DATE] [--to_html TO_HTML] [--to_fb2 TO_FB2] [source]")
-
-    elif args.source and not args.date:
-        logging.debug(f"Args.source: {args.source}")
-        logging.debug(f"Args.date: {args.date}")
-
-        new_feed = Feed(args.source)
-        new_feed.write_to_database(storage_file)
-
-        # create files using data from url
-        if args.to_html:
-            create_html(feeds_source=new_feed.get_dict(),
-                        path=args.to_html,
-                        limit=args.limit)
-        if args.to_fb2:
-            create_fb2(feeds_source=new_feed.get_dict(),
-                       path=args.to_fb2,
-                       limit=args.limit)
-
-        # output to stdout
-        if args.json:
-            new_feed.print_json_from_feed(args.limit)
-        else:
-            new_feed.print_text_from_feed(args.limit)
-
-    elif not args.source and args.date:
-        logging.debug(f"Args.source: {args.source}")
-        logging.debug(f"Args.date: {args.date}")
-
-        # date validation
-        if not is_valid_date(args.date, date_format):
-            return
-        else:
-            logging.debug(f"Arg.date '{args.date}' is correct.")
-
-        # get data from storage file
-        feeds_from_database = Feed.read_from_database(date=args.date, file_name=storage_file, source=args.source)
-
-        # create html using data from storage file
-        if args.to_html:
-            create_html(feeds_source=feeds_from_database,
-                        path=args.to_html,
-                        limit=args.limit)
-
-        # create fb2 using data from storage file
-        if args.to_fb2:
-            create_fb2(feeds_source=feeds_from_database,
-                       path=args.to_fb2,
-                       limit=args.limit)
-
-        # print to stdout
-        if args.json:
-            Feed.print_data_json(feeds_from_database, args.limit)
-        else:
-            print(Feed.get_text_from_storage(feeds_from_database, args.limit))
-
-    elif args.source and args.date:
-        logging.debug(f"Args.source: {args.source}")
-        logging.debug(f"Args.date: {args.date}")
-
-        # date validation
-        if not is_valid_date(args.date, date_format):
-            return
-        else:
-            logging.debug(f"Arg.date '{args.date}' is correct.")
-
-        # get data from storage file
-        feeds_from_database = Feed.read_from_database(date=args.date, file_name=storage_file, source=args.source)
-
-        # create html using data from storage file for exact source
-        if args.to_html:
-            create_html(feeds_source=feeds_from_database,
-                        path=args.to_html,
-                        limit=args.limit)
-
-        # create fb2 using data from storage file for exact source
-        if args.to_fb2:
-            create_fb2(feeds_source=feeds_from_database,
-                       path=args.to_fb2,
-                       limit=args.limit)
-
-        # print to stdout using data from storage file for exact source
-        if args.json:
-            print(Feed.print_data_json(feeds_from_database, args.limit))
-        else:
-            print(Feed.get_text_from_storage(feeds_from_database, args.limit))
-
-
-def is_valid_date(date_string, format):
-    """
-    Validation of date string format. Returns True if format is matching.
-    Arguments:
-        date_string - string that suppose to contain date. Example: 20201019 or 2021-10-11
-        format - format of date as in datetime library. Example: %Y%m%d or %Y-%m-%d
-    """
-    try:
-        datetime.strptime(date_string, format)
-    except ValueError:
-        print(f"String {date_string} is incorrect date. Correct format %Y%m%d (Example: 20211021)")
-        return False
-    else:
-        return True
-
-
+"""This module contains main code to run rss_reader command-line program."""
+
+from package.RssFeed import Feed
+import argparse
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+def _build_parser():
+    """
+    Build the argument parser for rss_reader.
+    Constructed on demand from main(), so importing this module
+    (for example from tests) does not parse sys.argv as a side effect.
+    """
+    parser = argparse.ArgumentParser(description="Get news from rss feed")
+    parser.add_argument("--version", action="version", version="Rss reader version 4.0")
+    parser.add_argument("--limit", default=0, type=int, help="Limit of news to display.")
+    parser.add_argument("--json", action="store_true", help="Print result as JSON in stdout.")
+    parser.add_argument("--verbose", action="store_true", help="Outputs verbose status messages.")
+    parser.add_argument("--date", type=str, help="Publishing date of news to display.")
+    parser.add_argument("--to_html", type=str, help="Create html file with news from rss feed.")
+    parser.add_argument("--to_fb2", type=str, help="Create fb2 file with news from rss feed.")
+    parser.add_argument("--legacy-storage", action="store_true",
+                        help="Read news from the legacy jsonl storage file instead of the sqlite database.")
+    parser.add_argument("source", type=str, nargs="?", help="Rss feed url", default=None)
+    return parser
+
+
+def main():
+    """
+    Main function to run rss_reader command-line program.
+    """
+    # fast path for the common fixed shape `rss_reader --date YYYYMMDD`:
+    # fill the namespace by hand and skip the argparse setup entirely;
+    # every other argv shape goes through the full parser
+    if len(sys.argv) == 3 and sys.argv[1] == "--date":
+        args = argparse.Namespace(limit=0, json=False, verbose=False, date=sys.argv[2],
+                                  to_html=None, to_fb2=None, legacy_storage=False, source=None)
+    else:
+        args = _build_parser().parse_args()
+
+    # file creation modules are imported only when their output is requested,
+    # so plain stdout runs do not pay for the html/fb2 stacks at startup
+    if args.to_html:
+        from package.create_html import create_html
+    if args.to_fb2:
+        from package.fb2 import create_fb2
+
+    date_format = "%Y%m%d"
+    storage_file = "storage.db"
+    legacy_storage_file = "storage.jsonl"
+
+    # remove dash for correct storing used sources when loading data from database
+    if args.source:
+        args.source = args.source.rstrip("/")
+
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG)
+
+    if not args.source and not args.date:
+        logging.debug("Args.source: %s", args.source)
+        logging.debug("Args.date: %s", args.date)
+        print("At least one arguments are required: source or date.")
+        print("usage: rss_reader [-h] [--version] [--limit LIMIT] [--json] [--verbose] "
+              "[--date DATE] [--to_html TO_HTML] [--to_fb2 TO_FB2] [source]")
+
+    elif args.source and not args.date:
+        logging.debug("Args.source: %s", args.source)
+        logging.debug("Args.date: %s", args.date)
+
+        new_feed = Feed.fetch(args.source, storage_file)
+        new_feed.write_to_database(storage_file)
+
+        # bind the feed dictionary once - get_dict caches it on the instance,
+        # so html, fb2 and stdout output share the same data
+        feed_data = new_feed.get_dict()
+
+        # the file writers are independent I/O-bound consumers of feed_data,
+        # so they run in worker threads while stdout prints on the main thread
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = []
+            if args.to_html:
+                futures.append(executor.submit(create_html, feeds_source=feed_data,
+                                               path=args.to_html, limit=args.limit))
+            if args.to_fb2:
+                futures.append(executor.submit(create_fb2, feeds_source=feed_data,
+                                               path=args.to_fb2, limit=args.limit))
+
+            # output to stdout
+            if args.json:
+                new_feed.print_json_from_feed(args.limit)
+            else:
+                new_feed.print_text_from_feed(args.limit)
+
+            # surface file writer errors (they raise SystemExit on failure)
+            for future in futures:
+                future.result()
+
+    elif not args.source and args.date:
+        logging.debug("Args.source: %s", args.source)
+        logging.debug("Args.date: %s", args.date)
+
+        # date validation
+        if not is_valid_date(args.date, date_format):
+            return
+        else:
+            logging.debug("Arg.date '%s' is correct.", args.date)
+
+        # get data from storage
+        if args.legacy_storage:
+            feeds_from_database = Feed.read_from_legacy_storage(date=args.date, file_name=legacy_storage_file,
+                                                                source=args.source)
+        else:
+            feeds_from_database = Feed.read_from_database(date=args.date, file_name=storage_file, source=args.source)
+
+        # create html using data from storage file
+        if args.to_html:
+            create_html(feeds_source=feeds_from_database,
+                        path=args.to_html,
+                        limit=args.limit)
+
+        # create fb2 using data from storage file
+        if args.to_fb2:
+            create_fb2(feeds_source=feeds_from_database,
+                       path=args.to_fb2,
+                       limit=args.limit)
+
+        # print to stdout
+        if args.json:
+            Feed.print_data_json(feeds_from_database, args.limit)
+        else:
+            print(Feed.get_text_from_storage(feeds_from_database, args.limit))
+
+    elif args.source and args.date:
+        logging.debug("Args.source: %s", args.source)
+        logging.debug("Args.date: %s", args.date)
+
+        # date validation
+        if not is_valid_date(args.date, date_format):
+            return
+        else:
+            logging.debug("Arg.date '%s' is correct.", args.date)
+
+        # get data from storage
+        if args.legacy_storage:
+            feeds_from_database = Feed.read_from_legacy_storage(date=args.date, file_name=legacy_storage_file,
+                                                                source=args.source)
+        else:
+            feeds_from_database = Feed.read_from_database(date=args.date, file_name=storage_file, source=args.source)
+
+        # create html using data from storage file for exact source
+        if args.to_html:
+            create_html(feeds_source=feeds_from_database,
+                        path=args.to_html,
+                        limit=args.limit)
+
+        # create fb2 using data from storage file for exact source
+        if args.to_fb2:
+            create_fb2(feeds_source=feeds_from_database,
+                       path=args.to_fb2,
+                       limit=args.limit)
+
+        # print to stdout using data from storage file for exact source
+        if args.json:
+            print(Feed.print_data_json(feeds_from_database, args.limit))
+        else:
+            print(Feed.get_text_from_storage(feeds_from_database, args.limit))
+
+
+def is_valid_date(date_string, format):
+    """
+    Validation of date string format. Returns True if format is matching.
+    Arguments:
+        date_string - string that suppose to contain date. Example: 20201019 or 2021-10-11
+        format - format of date as in datetime library. Example: %Y%m%d or %Y-%m-%d
+    """
+    # fast path for the one format the cli uses: a direct digit check plus
+    # datetime() construction skips the regex machinery strptime builds per call
+    if format == "%Y%m%d":
+        if len(date_string) == 8 and date_string.isdigit():
+            try:
+                datetime(int(date_string[:4]), int(date_string[4:6]), int(date_string[6:8]))
+            except ValueError:
+                pass
+            else:
+                return True
+        print(f"String {date_string} is incorrect date. Correct format %Y%m%d (Example: 20211021)")
+        return False
+
+    try:
+        datetime.strptime(date_string, format)
+    except ValueError:
+        print(f"String {date_string} is incorrect date. Correct format %Y%m%d (Example: 20211021)")
+        return False
+    else:
+        return True
+
+
@@ -0,0 +1,129 @@
+"""
+This module contains sqlite storage backend for rss_reader.
+Items are stored one row per item with an index on (pubDate, source),
+so date queries read only matching rows instead of scanning the whole
+history, and updates insert only new items inside one transaction.
+"""
+
+import json
+import logging
+import sqlite3
+
+# orjson serializes and parses json several times faster than stdlib;
+# fall back to stdlib json when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parse json string with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, indent=False):
+    """Serialize object to json string with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=3)
+    return json.dumps(obj)
+
+
+def connect(storage_path):
+    """
+    Open sqlite database at storage_path and create the schema if needed.
+    args:
+        storage_path: full path to the database file
+    """
+    conn = sqlite3.connect(storage_path)
+    conn.execute("CREATE TABLE IF NOT EXISTS feeds("
+                 "source TEXT, guid TEXT, pubDate TEXT, payload TEXT, "
+                 "PRIMARY KEY(source, guid))")
+    conn.execute("CREATE TABLE IF NOT EXISTS feed_meta("
+                 "source TEXT PRIMARY KEY, title TEXT, etag TEXT, last_modified TEXT)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_date_source ON feeds(pubDate, source)")
+    return conn
+
+
+def save_feed(conn, feed_dict):
+    """
+    Store feed meta record and new items inside a single transaction.
+    Items whose (source, guid) pair is already stored are ignored.
+    Returns count of newly inserted items.
+    args:
+        conn: open sqlite connection
+        feed_dict: feed dictionary with 'Source', 'Feed title', 'items'
+                   and optional 'ETag' / 'Last-Modified' keys
+    """
+    news_added = 0
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO feed_meta(source, title, etag, last_modified) "
+                     "VALUES(?, ?, ?, ?)",
+                     (feed_dict['Source'], feed_dict['Feed title'],
+                      feed_dict.get('ETag'), feed_dict.get('Last-Modified')))
+        for item in feed_dict['items']:
+            # the iso date lives in its own indexed column; keeping it out of
+            # the payload stops it leaking into items returned for display
+            payload = {key: value for key, value in item.items() if key != 'pubDateISO'}
+            cursor = conn.execute("INSERT OR IGNORE INTO feeds(source, guid, pubDate, payload) "
+                                  "VALUES(?, ?, ?, ?)",
+                                  (feed_dict['Source'], item.get('guid'),
+                                   item.get('pubDateISO'), json_dumps(payload)))
+            news_added += cursor.rowcount
+    logging.debug("Transaction finished. %s new items stored.", news_added)
+    return news_added
+
+
+def load_meta(conn, source):
+    """
+    Return meta dictionary (feed title and conditional GET headers) for the source,
+    or None when the source is not stored yet.
+    """
+    row = conn.execute("SELECT title, etag, last_modified FROM feed_meta WHERE source = ?",
+                       (source,)).fetchone()
+    if row is None:
+        return None
+    return {"Feed title": row[0], "ETag": row[1], "Last-Modified": row[2]}
+
+
+def load_titles(conn):
+    """Return dictionary mapping stored sources to their feed titles."""
+    return dict(conn.execute("SELECT source, title FROM feed_meta"))
+
+
+def _payload_to_item(payload):
+    """Parse a stored item payload, dropping the storage-only pubDateISO key
+    that databases written before it was excluded may still carry."""
+    item = json_loads(payload)
+    item.pop('pubDateISO', None)
+    return item
+
+
+def load_items(conn, source):
+    """Return all stored items for the source."""
+    return [_payload_to_item(payload) for (payload,)
+            in conn.execute("SELECT payload FROM feeds WHERE source = ?", (source,))]
+
+
+def load_items_by_date(conn, date_iso, source=None):
+    """
+    Return dictionary mapping sources to items published on the given date.
+    The (pubDate, source) index serves the query, so only matching rows are read.
+    args:
+        conn: open sqlite connection
+        date_iso: publication date in ISO format (Example: 2021-10-27)
+        source: optional feed url to restrict the query to one source
+    """
+    if source:
+        rows = conn.execute("SELECT source, payload FROM feeds WHERE pubDate = ? AND source = ?",
+                            (date_iso, source))
+    else:
+        rows = conn.execute("SELECT source, payload FROM feeds WHERE pubDate = ?", (date_iso,))
+    items_by_source = {}
+    for row_source, payload in rows:
+        items_by_source.setdefault(row_source, []).append(_payload_to_item(payload))
+    return items_by_source
@@ -14,7 +14,10 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     include_package_data=True,
-    install_requires=["fb2", "pathlib", "wheel", "docutils", "requests", "bs4", "python-dateutil", "lxml", "html5lib"],
+    install_requires=["fb2", "requests", "python-dateutil", "lxml",
+                      "orjson", "requests-cache", "aiohttp"],
+    extras_require={"tests": ["numpy"]},
+    python_requires=">=3.9",
     entry_points={"console_scripts": ["rss_reader=package:main"]}
 )
 
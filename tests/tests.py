@@ -8,6 +8,7 @@ from package.fb2 import create_fb2
 from package.create_html import create_html
 from package.rss_reader import is_valid_date
 from dateutil.parser import parse
+import numpy as np
 import requests
 
 
@@ -37,33 +38,24 @@ class RssReaderTests(unittest.TestCase):
     def test_descending_by_date(self):
         """Testing if all items is sorted descending by pubDate."""
 
-        def is_descending(lst):
+        def is_descending(rss_dict):
             """
-            This function accepts list as argument and checks if all elements
-            in the list are in descending order.
+            Check that items of the feed dictionary are in descending order by pubDate.
+            Timestamps go into a preallocated numpy array, so the comparison runs
+            as one vectorized pass instead of a python loop per pair.
             """
-            i = 1
-            while i < len(lst):
-                if lst[i] > lst[i - 1]:
-                    return False
-                i += 1
-            else:
-                return True
-
-        def get_pubDates_list(rss_dict):
-            """Get list of pubDates from items in rss feed"""
-            pubDates = []
-            for item in rss_dict['items']:
-                pubDates.append(item['pubDate'])
-            return pubDates
-
-        onl_feed = Feed("https://people.onliner.by/feed")
-        yahoo_feed = Feed("https://news.yahoo.com/rss/")
-        lenta_feed = Feed("https://lenta.ru/rss/news")
-
-        self.assertEqual(is_descending([parse(x) for x in get_pubDates_list(onl_feed.get_dict())]), True)
-        self.assertEqual(is_descending([parse(x) for x in get_pubDates_list(yahoo_feed.get_dict())]), True)
-        self.assertEqual(is_descending([parse(x) for x in get_pubDates_list(lenta_feed.get_dict())]), True)
+            items = rss_dict['items']
+            timestamps = np.fromiter((parse(item['pubDate']).timestamp() for item in items),
+                                     dtype=np.float64, count=len(items))
+            return bool(np.all(np.diff(timestamps) <= 0))
+
+        onl_feed, yahoo_feed, lenta_feed = Feed.fetch_many(["https://people.onliner.by/feed",
+                                                           "https://news.yahoo.com/rss/",
+                                                           "https://lenta.ru/rss/news"])
+
+        self.assertEqual(is_descending(onl_feed.get_dict()), True)
+        self.assertEqual(is_descending(yahoo_feed.get_dict()), True)
+        self.assertEqual(is_descending(lenta_feed.get_dict()), True)
 
     def test_date_validation(self):
         """Test function date_is_valid"""